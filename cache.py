@@ -0,0 +1,58 @@
+# Cache of encoded GET responses
+#
+# Entries are stored with the version of the data they were built from
+# (e.g. a collection's version counter). A lookup with a different version is
+# a miss, so writers never have to find and evict entries themselves.
+
+from collections import OrderedDict
+import threading
+
+
+class CacheEntry:
+    __slots__ = ('version', 'body')
+
+    def __init__(self, version, body):
+        self.version = version
+        self.body = body
+
+
+class ResponseCache:
+    def __init__(self, max_entries=256, max_body_size=1024 * 1024):
+        self.max_entries = max_entries
+        self.max_body_size = max_body_size  # bigger bodies aren't worth pinning in memory
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> CacheEntry, least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.body
+
+    def put(self, key, version, body):
+        if len(body) > self.max_body_size:
+            return
+        with self._lock:
+            self._entries[key] = CacheEntry(version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': sum(len(entry.body) for entry in self._entries.values()),
+            }
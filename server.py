@@ -1,23 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
 from http.server import BaseHTTPRequestHandler, HTTPServer
 import json
+import os
 import re
+import threading
+from urllib.parse import parse_qs, urlsplit
+from cache import ResponseCache
+from store import Store
+
+# Encode a list of records as a JSON array, a batch of records at a time, so
+# the whole document never has to exist in memory at once
+def iter_json_array(records, batch_size=256):
+    yield b'['
+    for start in range(0, len(records), batch_size):
+        batch = ','.join(json.dumps(record) for record in records[start:start + batch_size])
+        yield ((',' if start else '') + batch).encode('utf-8')
+    yield b']'
+
+# Same, as newline-delimited JSON (one record per line)
+def iter_ndjson(records, batch_size=256):
+    for start in range(0, len(records), batch_size):
+        yield ''.join(json.dumps(record) + '\n' for record in records[start:start + batch_size]).encode('utf-8')
 
 # In-memory data storage
-users = []
-houses = []
-rooms = []
-devices = []
+store = Store()
+users = store.users
+houses = store.houses
+rooms = store.rooms
+devices = store.devices
+
+# Encoded GET responses, keyed by path + query and checked against collection
+# versions. The epoch keeps ETags from one process run from matching the next.
+response_cache = ResponseCache()
+etag_epoch = os.urandom(4).hex()
 
 class SimpleAPIHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections open between requests
+    protocol_version = 'HTTP/1.1'
+    timeout = 30  # seconds an idle keep-alive connection is held open
+    max_requests_per_connection = 1000
+    max_drain_size = 64 * 1024  # unread request bodies up to this size are skipped, not a reason to close
+    disable_nagle_algorithm = True  # don't hold back small responses on reused connections
+
+    # query parameters each list endpoint can filter on (all backed by store indexes)
+    list_filters = {
+        'users': {},
+        'houses': {},
+        'rooms': {'houseId': int},
+        'devices': {'roomId': int, 'type': str},
+    }
+    # fields each collection's records have, in response order
+    fields = {
+        'users': ('name', 'email', 'password'),
+        'houses': ('name', 'address'),
+        'rooms': ('name', 'houseId'),
+        'devices': ('name', 'type', 'roomId'),
+    }
+    entity_names = {'users': 'User', 'houses': 'House', 'rooms': 'Room', 'devices': 'Device'}
+    max_bulk_items = 10000
+    default_page_size = 100
+    max_page_size = 1000
+    # lists longer than this are streamed instead of encoded in one go
+    stream_threshold = 1000
+    stream_batch_size = 256
+
+    # Count requests per connection and track whether the body was consumed,
+    # since leftover body bytes would be read as the next request
+    def handle_one_request(self):
+        self._requests_handled = getattr(self, '_requests_handled', 0) + 1
+        self._body_read = False
+        super().handle_one_request()
+
+    # Helper method to read the request body
+    def _read_body(self):
+        self._body_read = True
+        content_length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(content_length)
+
+    # Helper method to decide whether the connection is kept open after this
+    # response. Must run before end_headers().
+    def _send_connection_header(self):
+        if not self._body_read and int(self.headers.get('Content-Length') or 0) > 0:
+            if int(self.headers['Content-Length']) <= self.max_drain_size:
+                self._read_body()
+            else:
+                self.send_header('Connection', 'close')
+                return
+        if self._requests_handled >= self.max_requests_per_connection:
+            self.send_header('Connection', 'close')
+
     # Helper method to send responses
-    def _send_response(self, status_code, data=None, content_type='application/json'):
-        self.send_response(status_code)
-        self.send_header('Content-type', content_type)
-        self.end_headers()
+    def _send_response(self, status_code, data=None, content_type='application/json', headers=None):
+        body = None
         if data is not None:  # Explicitly check for None
             if not isinstance(data, str):
                 data = json.dumps(data)  # Convert list/dict to JSON string
-            self.wfile.write(data.encode('utf-8'))
+            body = data.encode('utf-8')
+        self._send_body(status_code, body, content_type, headers)
+
+    # Helper method to send an already encoded body
+    def _send_body(self, status_code, body=None, content_type='application/json', headers=None):
+        self.send_response(status_code)
+        self.send_header('Content-type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        # 204 and 304 responses never have a body, so they don't get a length
+        if status_code not in (204, 304):
+            self.send_header('Content-Length', str(len(body) if body is not None else 0))
+        self._send_connection_header()
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+    # Helper method to stream a response body from an iterable of byte chunks.
+    # Uses chunked transfer encoding when the connection speaks HTTP/1.1;
+    # otherwise the body simply ends when the connection is closed.
+    def _send_stream(self, status_code, chunks, content_type='application/json', headers=None):
+        chunked = self.request_version != 'HTTP/1.0' and self.protocol_version >= 'HTTP/1.1'
+        self.send_response(status_code)
+        self.send_header('Content-type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self._send_connection_header()
+        else:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if chunked:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            else:
+                self.wfile.write(chunk)
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+
+    def _wants_ndjson(self):
+        return 'application/x-ndjson' in (self.headers.get('Accept') or '')
+
+    # True if the client's If-None-Match already has this ETag
+    def _etag_matches(self, etag):
+        if_none_match = self.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags or f'W/{etag}' in tags
 
     # helper method to validate password
     def _validate_password(self, password):
@@ -30,18 +159,78 @@ class SimpleAPIHandler(BaseHTTPRequestHandler):
 
     # Handle GET requests (returns the lists of users/houses etc)
     def do_GET(self):
-        path = self.path.rstrip('/')  # Normalize path
-        if path == '/users':
-            self._send_response(200, users)  # Send the users list (even if empty)
-        elif path == '/houses':
-            self._send_response(200, houses)
-        elif path == '/rooms':
-            self._send_response(200, rooms)
-        elif path == '/devices':
-            self._send_response(200, devices)
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/')  # Normalize path
+        collection = store.collections().get(path[1:])
+        if collection is not None and path.count('/') == 1:
+            self._handle_list(collection, url.query)
+        elif path == '/_cache':
+            self._send_response(200, response_cache.stats())
         else:
             self._send_response(404, {'error': 'Not Found'})
 
+    # List a collection, optionally filtered (e.g. /devices?roomId=1&type=light)
+    # and paginated by id (?limit=50&cursor=<nextCursor of the previous page>).
+    # Without limit/cursor the plain list is returned, as before.
+    def _handle_list(self, collection, query_string):
+        query = parse_qs(query_string)
+        allowed = self.list_filters[collection.name]
+        filters = {}
+        for name, values in query.items():
+            if name in ('limit', 'cursor'):
+                continue
+            if name not in allowed:
+                self._send_response(400, {'error': f'Unknown filter: {name}'})
+                return
+            try:
+                filters[name] = allowed[name](values[-1])
+            except ValueError:
+                self._send_response(400, {'error': f'Invalid value for {name}'})
+                return
+
+        paginated = 'limit' in query or 'cursor' in query
+        limit = after = None
+        if paginated:
+            try:
+                limit = int(query.get('limit', [self.default_page_size])[-1])
+                after = int(query['cursor'][-1]) if 'cursor' in query else None
+            except ValueError:
+                self._send_response(400, {'error': 'limit and cursor must be integers'})
+                return
+            if not 1 <= limit <= self.max_page_size:
+                self._send_response(400, {'error': f'limit must be between 1 and {self.max_page_size}'})
+                return
+
+        # read the version before the data, so a concurrent write can only
+        # make the cached body newer than its version, never older
+        version = collection.version
+        etag = f'"{collection.name}-{etag_epoch}-{version}"'
+        if self._etag_matches(etag):
+            self._send_body(304, headers={'ETag': etag})
+            return
+        ndjson = self._wants_ndjson()
+        cache_key = (collection.name, query_string)
+        if not ndjson:
+            body = response_cache.get(cache_key, version)
+            if body is not None:
+                self._send_body(200, body, headers={'ETag': etag})
+                return
+
+        items, next_cursor = collection.query(filters, after=after, limit=limit)
+        if ndjson:
+            # NDJSON has no envelope, so the cursor goes in a header
+            headers = {'ETag': etag}
+            if next_cursor is not None:
+                headers['X-Next-Cursor'] = str(next_cursor)
+            self._send_stream(200, iter_ndjson(items, self.stream_batch_size), 'application/x-ndjson', headers)
+        elif not paginated and len(items) > self.stream_threshold:
+            self._send_stream(200, iter_json_array(items, self.stream_batch_size), headers={'ETag': etag})
+        else:
+            data = {'items': items, 'nextCursor': next_cursor} if paginated else items
+            body = json.dumps(data).encode('utf-8')
+            response_cache.put(cache_key, version, body)
+            self._send_body(200, body, headers={'ETag': etag})
+
     # Handle POST requests
     def do_POST(self):
         print(f"POST request received for path: {self.path}")  # Debug print
@@ -53,253 +242,260 @@ class SimpleAPIHandler(BaseHTTPRequestHandler):
             self._handle_create_room()
         elif self.path == '/devices':
             self._handle_create_device()
+        elif self._bulk_collection() is not None:
+            self._handle_bulk(self._bulk_collection())
         else:
             self._send_response(404, {'error': 'Not Found'})
-    
+
     # Handle DELETE requests
-        # Handle DELETE requests
     def do_DELETE(self):
         path = self.path.rstrip('/')  # Normalize path
-        
-        if path.startswith('/users/'):
-            user_id = int(path.split('/')[-1])
-            user_to_delete = next((user for user in users if user['id'] == user_id), None)
-            if user_to_delete:
-                users.remove(user_to_delete)
-                self._send_response(204)  # No Content
-            else:
-                self._send_response(404, {'error': 'User not found'})
 
+        if self._bulk_collection() is not None:
+            self._handle_bulk(self._bulk_collection())
+        elif path.startswith('/users/'):
+            self._handle_delete(users, int(path.split('/')[-1]))
         elif path.startswith('/houses/'):
-            house_id = int(path.split('/')[-1])
-            house_to_delete = next((house for house in houses if house['id'] == house_id), None)
-            if house_to_delete:
-                houses.remove(house_to_delete)
-                self._send_response(204)  # No Content
-            else:
-                self._send_response(404, {'error': 'House not found'})
-
+            self._handle_delete(houses, int(path.split('/')[-1]))
         elif path.startswith('/rooms/'):
-            room_id = int(path.split('/')[-1])
-            room_to_delete = next((room for room in rooms if room['id'] == room_id), None)
-            if room_to_delete:
-                rooms.remove(room_to_delete)
-                self._send_response(204)  # No Content
-            else:
-                self._send_response(404, {'error': 'Room not found'})
-
+            self._handle_delete(rooms, int(path.split('/')[-1]))
         elif path.startswith('/devices/'):
-            device_id = int(path.split('/')[-1])
-            device_to_delete = next((device for device in devices if device['id'] == device_id), None)
-            if device_to_delete:
-                devices.remove(device_to_delete)
-                self._send_response(204)  # No Content
-            else:
-                self._send_response(404, {'error': 'Device not found'})
-
+            self._handle_delete(devices, int(path.split('/')[-1]))
         else:
             self._send_response(404, {'error': 'Not Found'})
 
-
-       # Handle PUT requests (updates)
+    # Handle PUT requests (updates)
     def do_PUT(self):
         path = self.path.rstrip('/')  # Normalize path
 
-        if path.startswith('/users/'):
-            user_id = int(path.split('/')[-1])
-            user_to_update = next((user for user in users if user['id'] == user_id), None)
-            if user_to_update:
-                content_length = int(self.headers['Content-Length'])
-                put_data = self.rfile.read(content_length)
-                try:
-                    data = json.loads(put_data)
-                    # Update user fields
-                    if 'name' in data:
-                        user_to_update['name'] = data['name']
-                    if 'email' in data:
-                        if not self._validate_email(data['email']):
-                            self._send_response(400, {'error': 'Invalid email format'})
-                            return
-                        user_to_update['email'] = data['email']
-                    if 'password' in data:
-                        if not self._validate_password(data['password']):
-                            self._send_response(400, {'error': 'Password must be at least 8 characters long'})
-                            return
-                        user_to_update['password'] = data['password']
-                    self._send_response(200, user_to_update)
-                except json.JSONDecodeError:
-                    self._send_response(400, {'error': 'Invalid JSON'})
-            else:
-                self._send_response(404, {'error': 'User not found'})
-
+        if self._bulk_collection() is not None:
+            self._handle_bulk(self._bulk_collection())
+        elif path.startswith('/users/'):
+            self._handle_update(users, int(path.split('/')[-1]))
         elif path.startswith('/houses/'):
-            house_id = int(path.split('/')[-1])
-            house_to_update = next((house for house in houses if house['id'] == house_id), None)
-            if house_to_update:
-                content_length = int(self.headers['Content-Length'])
-                put_data = self.rfile.read(content_length)
-                try:
-                    data = json.loads(put_data)
-                    # Update house fields
-                    if 'name' in data:
-                        house_to_update['name'] = data['name']
-                    if 'address' in data:
-                        house_to_update['address'] = data['address']
-                    self._send_response(200, house_to_update)
-                except json.JSONDecodeError:
-                    self._send_response(400, {'error': 'Invalid JSON'})
-            else:
-                self._send_response(404, {'error': 'House not found'})
-
+            self._handle_update(houses, int(path.split('/')[-1]))
         elif path.startswith('/rooms/'):
-            room_id = int(path.split('/')[-1])
-            room_to_update = next((room for room in rooms if room['id'] == room_id), None)
-            if room_to_update:
-                content_length = int(self.headers['Content-Length'])
-                put_data = self.rfile.read(content_length)
-                try:
-                    data = json.loads(put_data)
-                    # Update room fields
-                    if 'name' in data:
-                        room_to_update['name'] = data['name']
-                    if 'houseId' in data:
-                        room_to_update['houseId'] = data['houseId']
-                    self._send_response(200, room_to_update)
-                except json.JSONDecodeError:
-                    self._send_response(400, {'error': 'Invalid JSON'})
-            else:
-                self._send_response(404, {'error': 'Room not found'})
-
+            self._handle_update(rooms, int(path.split('/')[-1]))
         elif path.startswith('/devices/'):
-            device_id = int(path.split('/')[-1])
-            device_to_update = next((device for device in devices if device['id'] == device_id), None)
-            if device_to_update:
-                content_length = int(self.headers['Content-Length'])
-                put_data = self.rfile.read(content_length)
-                try:
-                    data = json.loads(put_data)
-                    # Update device fields
-                    if 'name' in data:
-                        device_to_update['name'] = data['name']
-                    if 'type' in data:
-                        device_to_update['type'] = data['type']
-                    if 'roomId' in data:
-                        device_to_update['roomId'] = data['roomId']
-                    self._send_response(200, device_to_update)
-                except json.JSONDecodeError:
-                    self._send_response(400, {'error': 'Invalid JSON'})
-            else:
-                self._send_response(404, {'error': 'Device not found'})
-
+            self._handle_update(devices, int(path.split('/')[-1]))
         else:
             self._send_response(404, {'error': 'Not Found'})
 
+    def _handle_delete(self, collection, record_id):
+        if collection.remove(record_id) is not None:
+            self._send_response(204)  # No Content
+        else:
+            self._send_response(404, {'error': f'{self.entity_names[collection.name]} not found'})
+
+    def _handle_update(self, collection, record_id):
+        if not collection.exists(record_id):
+            self._send_response(404, {'error': f'{self.entity_names[collection.name]} not found'})
+            return
+        put_data = self._read_body()
+        try:
+            data = json.loads(put_data)
+        except json.JSONDecodeError:
+            self._send_response(400, {'error': 'Invalid JSON'})
+            return
+        with store.lock:
+            error = self._check_update(collection, record_id, data)
+            if error is None:
+                # Update the fields that were sent
+                changes = {key: data[key] for key in self.fields[collection.name] if key in data}
+                record = collection.update(record_id, changes)
+        if error is not None:
+            self._send_response(error[0], {'error': error[1]})
+            return
+        self._send_response(200, record)
+
+    # Validation shared by the single and bulk endpoints. Each check returns
+    # None if the data is fine, otherwise a (status code, error message) pair.
+    # Checks that look at other records must run while holding store.lock.
+    def _check_create(self, collection, data):
+        if not isinstance(data, dict) or not all(key in data for key in self.fields[collection.name]):
+            return 400, 'Missing required fields'
+        if collection is users:
+            return self._check_user_fields(data)
+        if collection is rooms and not houses.exists(data['houseId']):
+            return 404, 'House not found'
+        if collection is devices and not rooms.exists(data['roomId']):
+            return 404, 'Room not found'
+        return None
+
+    def _check_update(self, collection, record_id, data):
+        if not isinstance(data, dict):
+            return 400, 'Expected a JSON object'
+        if not collection.exists(record_id):
+            return 404, f'{self.entity_names[collection.name]} not found'
+        if collection is users:
+            return self._check_user_fields(data)
+        return None
+
+    def _check_user_fields(self, data):
+        # validate email format
+        if 'email' in data and not self._validate_email(data['email']):
+            return 400, 'Invalid email format'
+        # validate password length
+        if 'password' in data and not self._validate_password(data['password']):
+            return 400, 'Password must be at least 8 characters long'
+        return None
+
+    # Shared body of the create handlers: validate, then insert under the
+    # store lock so a parent can't be deleted between the check and the insert
+    def _create(self, collection, data):
+        with store.lock:
+            error = self._check_create(collection, data)
+            if error is None:
+                record = collection.create({key: data[key] for key in self.fields[collection.name]})
+        if error is not None:
+            self._send_response(error[0], {'error': error[1]})
+            return
+        self._send_response(201, record)
 
     def _handle_create_user(self):
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
+        post_data = self._read_body()
         print(f"Raw POST data: {post_data}")  # Debug print
         try:
             data = json.loads(post_data)
             print(f"Parsed JSON data: {data}")  # Debug print
-            # Validate input
-            if not all(key in data for key in ['name', 'email', 'password']):
-                self._send_response(400, {'error': 'Missing required fields'})
-                return
-            # validate email format
-            if not self._validate_email(data['email']):
-                self._send_response(400, {'error': 'Invalid email format'})
-                return
-            # validate password length
-            if not self._validate_password(data['password']):
-                self._send_response(400, {'error': 'Password must be at least 8 characters long'})
-                return
-            # Simulate adding a user
-            user = {
-                'id': len(users) + 1,
-                'name': data['name'],
-                'email': data['email'],
-                'password': data['password']
-            }
-            users.append(user)
-            self._send_response(201, user)
+            self._create(users, data)
         except json.JSONDecodeError:
             print("Invalid JSON received")  # Debug print
             self._send_response(400, {'error': 'Invalid JSON'})
 
     def _handle_create_house(self):
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
+        post_data = self._read_body()
         try:
-            data = json.loads(post_data)
-            # Validate input
-            if not all(key in data for key in ['name', 'address']):
-                self._send_response(400, {'error': 'Missing required fields'})
-                return
-            # Simulate adding a house
-            house = {
-                'id': len(houses) + 1,
-                'name': data['name'],
-                'address': data['address']
-            }
-            houses.append(house)
-            self._send_response(201, house)
+            self._create(houses, json.loads(post_data))
         except json.JSONDecodeError:
             self._send_response(400, {'error': 'Invalid JSON'})
 
     def _handle_create_room(self):
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
+        post_data = self._read_body()
         try:
-            data = json.loads(post_data)
-            # Validate input
-            if not all(key in data for key in ['name', 'houseId']):
-                self._send_response(400, {'error': 'Missing required fields'})
-                return
-            # Check if house exists
-            if not any(house['id'] == data['houseId'] for house in houses):
-                self._send_response(404, {'error': 'House not found'})
-                return
-            # Simulate adding a room
-            room = {
-                'id': len(rooms) + 1,
-                'name': data['name'],
-                'houseId': data['houseId']
-            }
-            rooms.append(room)
-            self._send_response(201, room)
+            self._create(rooms, json.loads(post_data))
         except json.JSONDecodeError:
             self._send_response(400, {'error': 'Invalid JSON'})
 
     def _handle_create_device(self):
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
+        post_data = self._read_body()
         try:
-            data = json.loads(post_data)
-            # Validate input
-            if not all(key in data for key in ['name', 'type', 'roomId']):
-                self._send_response(400, {'error': 'Missing required fields'})
-                return
-            # Check if room exists
-            if not any(room['id'] == data['roomId'] for room in rooms):
-                self._send_response(404, {'error': 'Room not found'})
-                return
-            # Simulate adding a device
-            device = {
-                'id': len(devices) + 1,
-                'name': data['name'],
-                'type': data['type'],
-                'roomId': data['roomId']
-            }
-            devices.append(device)
-            self._send_response(201, device)
+            self._create(devices, json.loads(post_data))
         except json.JSONDecodeError:
             self._send_response(400, {'error': 'Invalid JSON'})
 
+    # The collection addressed by /<collection>/_bulk, if that's the path
+    def _bulk_collection(self):
+        parts = urlsplit(self.path).path.strip('/').split('/')
+        if len(parts) == 2 and parts[1] == '_bulk':
+            return store.collections().get(parts[0])
+        return None
+
+    # Bulk create/update/delete. The body is a JSON array: records to create
+    # (POST), records with an id plus the fields to change (PUT), or ids to
+    # delete (DELETE). The whole batch is checked and applied in one pass
+    # under the store lock. By default every item succeeds or fails on its
+    # own and gets its own status in `results`; with ?atomic=true nothing is
+    # applied unless every item passes.
+    def _handle_bulk(self, collection):
+        body = self._read_body()
+        try:
+            items = json.loads(body)
+        except json.JSONDecodeError:
+            self._send_response(400, {'error': 'Invalid JSON'})
+            return
+        if not isinstance(items, list):
+            self._send_response(400, {'error': 'Expected a JSON array'})
+            return
+        if len(items) > self.max_bulk_items:
+            self._send_response(400, {'error': f'At most {self.max_bulk_items} items per request'})
+            return
+        atomic = parse_qs(urlsplit(self.path).query).get('atomic', [''])[-1].lower() in ('1', 'true', 'yes')
+
+        with store.lock:
+            errors = self._check_bulk(collection, items)
+            if atomic and any(errors):
+                results = None
+            else:
+                results = [
+                    {'status': error[0], 'error': error[1]} if error else self._apply_bulk_item(collection, item)
+                    for item, error in zip(items, errors)
+                ]
+        if results is None:
+            failed = [{'index': i, 'status': error[0], 'error': error[1]} for i, error in enumerate(errors) if error]
+            self._send_response(400, {'error': 'Batch rejected', 'failed': failed})
+            return
+        self._send_response(200, {'results': results})
+
+    def _check_bulk(self, collection, items):
+        if self.command == 'POST':
+            return [self._check_create(collection, item) for item in items]
+        errors = []
+        seen = set()  # a record can only be deleted once per batch
+        for item in items:
+            record_id = item.get('id') if isinstance(item, dict) else item
+            if self.command == 'PUT':
+                errors.append(self._check_update(collection, record_id, item))
+            elif not collection.exists(record_id) or record_id in seen:
+                errors.append((404, f'{self.entity_names[collection.name]} not found'))
+            else:
+                seen.add(record_id)
+                errors.append(None)
+        return errors
+
+    def _apply_bulk_item(self, collection, item):
+        fields = self.fields[collection.name]
+        if self.command == 'POST':
+            return {'status': 201, 'item': collection.create({key: item[key] for key in fields})}
+        if self.command == 'PUT':
+            changes = {key: item[key] for key in fields if key in item}
+            return {'status': 200, 'item': collection.update(item['id'], changes)}
+        record_id = item.get('id') if isinstance(item, dict) else item
+        collection.remove(record_id)
+        return {'status': 204, 'id': record_id}
+
+# HTTP server that hands each connection to a bounded pool of worker threads.
+# At most `workers` connections are handled at once and `backlog` more can be
+# queued inside the process; beyond that the accept loop waits and new
+# connections stay in the kernel's listen queue (also sized by `backlog`).
+class ThreadPoolHTTPServer(HTTPServer):
+    def __init__(self, server_address, handler_class, workers=8, backlog=64):
+        self.request_queue_size = backlog
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api-worker')
+        self._slots = threading.BoundedSemaphore(workers + backlog)
+        super().__init__(server_address, handler_class)
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._process_request_worker, request, client_address)
+        except RuntimeError:  # executor already shut down
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
 # Run the server
-def run(server_class=HTTPServer, handler_class=SimpleAPIHandler, port=8000):
+# Pass `workers` to serve requests concurrently from a thread pool instead of
+# one at a time.
+def run(server_class=HTTPServer, handler_class=SimpleAPIHandler, port=8000, workers=None, backlog=64):
     server_address = ('', port)
-    httpd = server_class(server_address, handler_class)
+    if workers:
+        httpd = ThreadPoolHTTPServer(server_address, handler_class, workers=workers, backlog=backlog)
+    else:
+        httpd = server_class(server_address, handler_class)
     print(f'Starting server on port {port}...')
     httpd.serve_forever()
 
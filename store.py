@@ -0,0 +1,234 @@
+# In-memory entity store
+#
+# Each collection keeps its records in a dict keyed by id (primary index) plus
+# optional secondary indexes on fields like houseId/roomId, so lookups,
+# existence checks, updates and deletes don't have to scan a list.
+#
+# All collections of a store share one re-entrant lock. Single operations take
+# it themselves; handlers that need check-then-write (parent exists, then
+# insert) hold `store.lock` around the whole sequence. Updates replace the
+# stored dict instead of mutating it, so a record handed out to a reader never
+# changes underneath it while it is being serialized.
+
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+import os
+import threading
+
+
+# Hands out increasing ids for one collection. Ids are never reused, even after
+# deletes. With a `path` the high-water mark is persisted in blocks of
+# `block_size`, so a restarted process skips past anything it may already have
+# handed out without writing to disk on every create.
+class IdAllocator:
+    def __init__(self, start=1, path=None, block_size=1000):
+        self._lock = threading.Lock()
+        self._next = start
+        self._path = path
+        self._block_size = block_size
+        self._reserved = start
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._next = max(start, int(f.read().strip() or start))
+            self._reserved = self._next
+
+    @property
+    def next_id(self):
+        return self._next
+
+    def allocate(self):
+        with self._lock:
+            record_id = self._next
+            self._next += 1
+            if self._path and self._next > self._reserved:
+                self._reserve(self._next + self._block_size)
+            return record_id
+
+    # make sure an id that came from elsewhere (explicit insert, reload) is
+    # never handed out again
+    def observe(self, record_id):
+        if not isinstance(record_id, int) or record_id < self._next:
+            return
+        with self._lock:
+            if record_id >= self._next:
+                self._next = record_id + 1
+                if self._path and self._next > self._reserved:
+                    self._reserve(self._next + self._block_size)
+
+    def reset(self, next_id=1):
+        with self._lock:
+            self._next = next_id
+            if self._path:
+                self._reserve(next_id)
+
+    def _reserve(self, ceiling):
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(ceiling))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
+        self._reserved = ceiling
+
+
+class Collection:
+    def __init__(self, name, indexed_fields=(), lock=None, ids=None):
+        self.name = name
+        self.lock = lock or threading.RLock()
+        self.ids = ids or IdAllocator()
+        self._records = {}  # id -> record, in insertion order
+        self._order = []  # ids kept sorted, for keyset pagination
+        self.version = 0  # bumped on every change, used to invalidate cached responses
+        # field -> value -> {id: record}; inner dicts keep insertion order too
+        self._indexes = {field: {} for field in indexed_fields}
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def __contains__(self, record_id):
+        return self.exists(record_id)
+
+    # JSON-friendly copy of the collection (same shape as the old lists)
+    def all(self):
+        with self.lock:
+            return list(self._records.values())
+
+    def get(self, record_id):
+        try:
+            return self._records.get(record_id)
+        except TypeError:  # unhashable id from a bad request body
+            return None
+
+    def exists(self, record_id):
+        return self.get(record_id) is not None
+
+    # records whose indexed field equals value
+    def find(self, field, value):
+        with self.lock:
+            return list(self._indexes[field].get(value, {}).values())
+
+    def count(self, field, value):
+        with self.lock:
+            return len(self._indexes[field].get(value, ()))
+
+    # One page of records in id order. `filters` maps indexed fields to the
+    # value they must equal; `after` is the last id of the previous page.
+    # Returns (records, next_cursor), next_cursor being None on the last page.
+    def query(self, filters=None, after=None, limit=None):
+        with self.lock:
+            if filters:
+                # walk the smallest matching bucket and check the others
+                buckets = sorted((self._indexes[field].get(value, {}) for field, value in filters.items()), key=len)
+                ids = sorted(buckets[0])  # near-sorted already, so this is cheap
+                if after is not None:
+                    ids = ids[bisect_right(ids, after):]
+                matches = (record_id for record_id in ids if all(record_id in bucket for bucket in buckets[1:]))
+            else:
+                start = bisect_right(self._order, after) if after is not None else 0
+                matches = (self._order[i] for i in range(start, len(self._order)))
+            if limit is None:
+                page = list(matches)
+            else:
+                page = list(islice(matches, limit + 1))
+            next_cursor = None
+            if limit is not None and len(page) > limit:
+                page = page[:limit]
+                next_cursor = page[-1]
+            return [self._records[record_id] for record_id in page], next_cursor
+
+    # insert a new record with the next free id
+    def create(self, fields):
+        with self.lock:
+            return self.add({'id': self.ids.allocate(), **fields})
+
+    # insert a record that already has an id
+    def add(self, record):
+        with self.lock:
+            record_id = record['id']
+            self.ids.observe(record_id)
+            if record_id in self._records:
+                self._unindex(self._records[record_id])
+            elif not self._order or record_id > self._order[-1]:
+                self._order.append(record_id)
+            else:
+                insort(self._order, record_id)
+            self._records[record_id] = record
+            self._index(record)
+            self.version += 1
+        return record
+
+    # apply changes to a stored record, keeping the secondary indexes in sync
+    def update(self, record_id, changes):
+        with self.lock:
+            record = self.get(record_id)
+            if record is None:
+                return None
+            updated = {**record, **changes}
+            self._unindex(record)
+            self._records[record_id] = updated
+            self._index(updated)
+            self.version += 1
+        return updated
+
+    def remove(self, record_id):
+        with self.lock:
+            if not self.exists(record_id):
+                return None
+            record = self._records.pop(record_id)
+            del self._order[bisect_left(self._order, record_id)]
+            self._unindex(record)
+            self.version += 1
+        return record
+
+    # drop everything; a wiped collection starts numbering from 1 again
+    def clear(self):
+        with self.lock:
+            self._records.clear()
+            self._order.clear()
+            for index in self._indexes.values():
+                index.clear()
+            self.ids.reset()
+            self.version += 1
+
+    def _index(self, record):
+        for field, index in self._indexes.items():
+            index.setdefault(record.get(field), {})[record['id']] = record
+
+    def _unindex(self, record):
+        for field, index in self._indexes.items():
+            bucket = index.get(record.get(field))
+            if bucket is None:
+                continue
+            bucket.pop(record['id'], None)
+            if not bucket:
+                del index[record.get(field)]
+
+
+class Store:
+    # `id_dir` keeps each collection's id high-water mark on disk
+    def __init__(self, id_dir=None):
+        self.lock = threading.RLock()
+        self.users = self._collection('users', (), id_dir)
+        self.houses = self._collection('houses', (), id_dir)
+        self.rooms = self._collection('rooms', ('houseId',), id_dir)
+        self.devices = self._collection('devices', ('roomId', 'type'), id_dir)
+
+    def _collection(self, name, indexed_fields, id_dir):
+        path = os.path.join(id_dir, f'{name}.id') if id_dir else None
+        return Collection(name, indexed_fields, lock=self.lock, ids=IdAllocator(path=path))
+
+    def collections(self):
+        return {
+            'users': self.users,
+            'houses': self.houses,
+            'rooms': self.rooms,
+            'devices': self.devices,
+        }
+
+    def clear(self):
+        with self.lock:
+            for collection in self.collections().values():
+                collection.clear()
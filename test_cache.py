@@ -0,0 +1,27 @@
+from cache import ResponseCache
+
+
+def test_hit_and_miss_by_version():
+    cache = ResponseCache()
+    assert cache.get('devices', 1) is None
+    cache.put('devices', 1, b'[]')
+    assert cache.get('devices', 1) == b'[]'
+    assert cache.get('devices', 2) is None  # data changed since it was cached
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 1, 'bytes': 2}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put('a', 1, b'a')
+    cache.put('b', 1, b'b')
+    cache.get('a', 1)
+    cache.put('c', 1, b'c')
+    assert cache.get('b', 1) is None
+    assert cache.get('a', 1) == b'a'
+    assert cache.get('c', 1) == b'c'
+
+
+def test_large_bodies_are_not_cached():
+    cache = ResponseCache(max_body_size=4)
+    cache.put('big', 1, b'12345')
+    assert cache.get('big', 1) is None
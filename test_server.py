@@ -223,24 +223,25 @@ def test_delete_house(server):
 def test_update_user(server):
     # Create a user first
     user_data = {'name': 'John Doe', 'email': 'john@example.com', 'password': 'password123'}
-    send_request('POST', '/users', data=user_data)
+    user_id = send_request('POST', '/users', data=user_data).json()['id']
+    assert user_id == 2  # ids are not reused after user 1 was deleted
 
     # Update the user
     updated_data = {'name': 'John Updated', 'email': 'john.updated@example.com', 'password': 'newpassword123'}
-    response = send_request('PUT', '/users/1', data=updated_data)
+    response = send_request('PUT', f'/users/{user_id}', data=updated_data)
 
     assert response.status_code == 200
-    assert response.json() == {'id': 1, **updated_data}
+    assert response.json() == {'id': user_id, **updated_data}
 
 # Test DELETE room
 def test_delete_room(server):
     # Ensure a house exists first
     house_data = {'name': 'My House', 'address': '123 Main St'}
-    send_request('POST', '/houses', data=house_data)
+    house_id = send_request('POST', '/houses', data=house_data).json()['id']
 
     # Create two rooms (to check if only one gets deleted)
-    room_data1 = {'name': 'Living Room', 'houseId': 1}
-    room_data2 = {'name': 'Bedroom', 'houseId': 1}
+    room_data1 = {'name': 'Living Room', 'houseId': house_id}
+    room_data2 = {'name': 'Bedroom', 'houseId': house_id}
     send_request('POST', '/rooms', data=room_data1)
     send_request('POST', '/rooms', data=room_data2)
 
@@ -266,23 +267,23 @@ def test_delete_room(server):
 def test_update_house(server):
     # Create a house first
     house_data = {'name': 'My House', 'address': '123 Main St'}
-    send_request('POST', '/houses', data=house_data)
+    house_id = send_request('POST', '/houses', data=house_data).json()['id']
 
     # Update the house
     updated_data = {'name': 'Updated House', 'address': '456 New St'}
-    response = send_request('PUT', '/houses/1', data=updated_data)
+    response = send_request('PUT', f'/houses/{house_id}', data=updated_data)
 
     assert response.status_code == 200
-    assert response.json() == {'id': 1, **updated_data}
+    assert response.json() == {'id': house_id, **updated_data}
 
 # Test PUT (UPDATE) room
 def test_update_room(server):
     # Ensure a house exists first
     house_data = {'name': 'My House', 'address': '123 Main St'}
-    send_request('POST', '/houses', data=house_data)
+    house_id = send_request('POST', '/houses', data=house_data).json()['id']
 
     # Create a room before trying to update it
-    room_data = {'name': 'Living Room', 'houseId': 1}
+    room_data = {'name': 'Living Room', 'houseId': house_id}
     send_request('POST', '/rooms', data=room_data)
 
     # Fetch the created room to verify its ID
@@ -298,15 +299,15 @@ def test_update_room(server):
     response = send_request('PUT', f'/rooms/{room_id}', data=updated_data)
 
     assert response.status_code == 200
-    assert response.json() == {'id': room_id, 'houseId': 1, **updated_data}
+    assert response.json() == {'id': room_id, 'houseId': house_id, **updated_data}
 
 # test to update device
 def test_update_device(server):
     # Ensure a house and room exist first
     house_data = {'name': 'My House', 'address': '123 Main St'}
-    send_request('POST', '/houses', data=house_data)
+    house_id = send_request('POST', '/houses', data=house_data).json()['id']
 
-    room_data = {'name': 'Living Room', 'houseId': 1}
+    room_data = {'name': 'Living Room', 'houseId': house_id}
     send_request('POST', '/rooms', data=room_data)
 
     # Fetch the created room to verify its ID
@@ -320,13 +321,12 @@ def test_update_device(server):
     device_data = {'name': 'Smart Light', 'type': 'light', 'roomId': room_id}
     response = send_request('POST', '/devices', data=device_data)
     assert response.status_code == 201  # Ensure device creation succeeds
+    device_id = response.json()['id']  # Get the actual device ID
 
-    # Fetch the created device to verify its ID
+    # Make sure the new device is listed
     response = send_request('GET', '/devices')
     assert response.status_code == 200
-    devices = response.json()
-    assert len(devices) > 0  # Ensure a device was created
-    device_id = devices[0]['id']  # Get the actual device ID
+    assert device_id in [device['id'] for device in response.json()]
 
     # Update the device
     updated_data = {'name': 'Updated Smart Light', 'type': 'LED'}
@@ -334,3 +334,141 @@ def test_update_device(server):
 
     assert response.status_code == 200
     assert response.json() == {'id': device_id, 'roomId': room_id, **updated_data}
+
+# Test filtering and paginating list endpoints
+def test_list_devices_filtered_and_paginated(server):
+    house_id = send_request('POST', '/houses', data={'name': 'Paged House', 'address': '1 Page St'}).json()['id']
+    room_id = send_request('POST', '/rooms', data={'name': 'Paged Room', 'houseId': house_id}).json()['id']
+    created = [
+        send_request('POST', '/devices', data={'name': f'Light {i}', 'type': 'light' if i % 2 else 'fan', 'roomId': room_id}).json()
+        for i in range(5)
+    ]
+
+    response = send_request('GET', f'/devices?roomId={room_id}')
+    assert response.status_code == 200
+    assert response.json() == created
+
+    response = send_request('GET', f'/devices?roomId={room_id}&type=light&limit=1')
+    assert response.status_code == 200
+    page = response.json()
+    assert page['items'] == [created[1]]
+    assert page['nextCursor'] == created[1]['id']
+
+    response = send_request('GET', f'/devices?roomId={room_id}&type=light&limit=1&cursor={page["nextCursor"]}')
+    assert response.json() == {'items': [created[3]], 'nextCursor': None}
+
+    response = send_request('GET', f'/rooms?houseId={house_id}')
+    assert [room['id'] for room in response.json()] == [room_id]
+
+def test_list_invalid_query(server):
+    assert send_request('GET', '/devices?color=red').status_code == 400
+    assert send_request('GET', '/devices?roomId=abc').status_code == 400
+    assert send_request('GET', '/devices?limit=0').status_code == 400
+    assert send_request('GET', '/users?cursor=x').status_code == 400
+
+# Test streamed list responses
+def test_get_devices_streamed(server, monkeypatch):
+    monkeypatch.setattr(SimpleAPIHandler, 'stream_threshold', 1)
+    monkeypatch.setattr(SimpleAPIHandler, 'stream_batch_size', 2)
+    expected = send_request('GET', '/devices?limit=1000').json()['items']
+    assert len(expected) > 2
+
+    response = send_request('GET', '/devices')
+    assert response.status_code == 200
+    assert response.json() == expected
+
+def test_get_devices_ndjson(server):
+    import requests
+    response = requests.get('http://localhost:8000/devices?limit=2', headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    assert response.headers['Content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == send_request('GET', '/devices?limit=2').json()['items']
+    assert response.headers['X-Next-Cursor'] == str(lines[-1]['id'])
+
+def test_stream_encoders():
+    from server import iter_json_array, iter_ndjson
+    records = [{'id': i, 'name': f'Device {i}'} for i in range(5)]
+    assert json.loads(b''.join(iter_json_array(records, batch_size=2))) == records
+    assert json.loads(b''.join(iter_json_array([], batch_size=2))) == []
+    lines = b''.join(iter_ndjson(records, batch_size=2)).decode().splitlines()
+    assert [json.loads(line) for line in lines] == records
+
+# Test cached GET responses and ETags
+def test_get_houses_etag_and_cache(server):
+    import requests
+    from server import response_cache
+    url = 'http://localhost:8000/houses'
+    first = requests.get(url)
+    etag = first.headers['ETag']
+
+    hits = response_cache.stats()['hits']
+    second = requests.get(url)
+    assert second.json() == first.json()
+    assert response_cache.stats()['hits'] == hits + 1
+
+    not_modified = requests.get(url, headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b''
+
+    # a write bumps the collection version, so the old ETag no longer matches
+    send_request('POST', '/houses', data={'name': 'Cache House', 'address': '2 Cache St'})
+    changed = requests.get(url, headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.json()[-1]['name'] == 'Cache House'
+
+    stats = send_request('GET', '/_cache').json()
+    assert stats['hits'] >= 1 and stats['misses'] >= 1
+
+# Test bulk endpoints
+def test_bulk_create_devices_per_item_status(server):
+    house_id = send_request('POST', '/houses', data={'name': 'Bulk House', 'address': '3 Bulk St'}).json()['id']
+    room_id = send_request('POST', '/rooms', data={'name': 'Bulk Room', 'houseId': house_id}).json()['id']
+    items = [
+        {'name': 'Sensor 1', 'type': 'sensor', 'roomId': room_id},
+        {'name': 'Sensor 2', 'type': 'sensor', 'roomId': 999999},
+        {'name': 'Sensor 3', 'type': 'sensor'},
+    ]
+    response = send_request('POST', '/devices/_bulk', data=items)
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [result['status'] for result in results] == [201, 404, 400]
+    assert results[0]['item']['name'] == 'Sensor 1'
+    assert results[1]['error'] == 'Room not found'
+    assert send_request('GET', f'/devices?roomId={room_id}').json() == [results[0]['item']]
+
+def test_bulk_atomic_batch_is_all_or_nothing(server):
+    room_id = send_request('GET', '/rooms').json()[-1]['id']
+    before = send_request('GET', '/devices').json()
+    items = [{'name': 'Ok', 'type': 'light', 'roomId': room_id}, {'name': 'Bad', 'type': 'light', 'roomId': 999999}]
+    response = send_request('POST', '/devices/_bulk?atomic=true', data=items)
+    assert response.status_code == 400
+    assert response.json()['failed'] == [{'index': 1, 'status': 404, 'error': 'Room not found'}]
+    assert send_request('GET', '/devices').json() == before
+
+def test_bulk_update_and_delete(server):
+    room_id = send_request('GET', '/rooms').json()[-1]['id']
+    created = send_request('POST', '/devices/_bulk', data=[
+        {'name': f'Plug {i}', 'type': 'plug', 'roomId': room_id} for i in range(3)
+    ]).json()['results']
+    ids = [result['item']['id'] for result in created]
+
+    response = send_request('PUT', '/devices/_bulk', data=[{'id': ids[0], 'name': 'Renamed'}, {'id': 999999, 'name': 'x'}])
+    assert [result['status'] for result in response.json()['results']] == [200, 404]
+    assert response.json()['results'][0]['item']['name'] == 'Renamed'
+
+    import requests
+    response = requests.delete('http://localhost:8000/devices/_bulk', json=ids + [ids[0]])
+    assert [result['status'] for result in response.json()['results']] == [204, 204, 204, 404]
+    remaining = {device['id'] for device in send_request('GET', '/devices').json()}
+    assert remaining.isdisjoint(ids)
+
+def test_bulk_users_reuse_validation(server):
+    response = send_request('POST', '/users/_bulk', data=[
+        {'name': 'A', 'email': 'not-an-email', 'password': 'password123'},
+        {'name': 'B', 'email': 'b@example.com', 'password': 'short'},
+    ])
+    assert [result['error'] for result in response.json()['results']] == [
+        'Invalid email format', 'Password must be at least 8 characters long'
+    ]
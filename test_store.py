@@ -0,0 +1,119 @@
+import threading
+from store import Collection, IdAllocator, Store
+
+
+def make_devices():
+    devices = Collection('devices', indexed_fields=('roomId',))
+    devices.add({'id': 1, 'name': 'Lamp', 'type': 'light', 'roomId': 1})
+    devices.add({'id': 2, 'name': 'Heater', 'type': 'heater', 'roomId': 1})
+    devices.add({'id': 3, 'name': 'Fan', 'type': 'fan', 'roomId': 2})
+    return devices
+
+
+def test_get_and_exists():
+    devices = make_devices()
+    assert devices.get(2)['name'] == 'Heater'
+    assert devices.exists(3)
+    assert not devices.exists(99)
+    assert not devices.exists([1])  # unhashable ids are just missing
+    assert len(devices) == 3
+
+
+def test_all_keeps_insertion_order():
+    devices = make_devices()
+    assert [device['id'] for device in devices.all()] == [1, 2, 3]
+
+
+def test_secondary_index_lookup():
+    devices = make_devices()
+    assert [device['id'] for device in devices.find('roomId', 1)] == [1, 2]
+    assert devices.count('roomId', 2) == 1
+    assert devices.find('roomId', 42) == []
+
+
+def test_update_moves_record_between_index_buckets():
+    devices = make_devices()
+    updated = devices.update(1, {'roomId': 2, 'name': 'Desk Lamp'})
+    assert updated == {'id': 1, 'name': 'Desk Lamp', 'type': 'light', 'roomId': 2}
+    assert [device['id'] for device in devices.find('roomId', 1)] == [2]
+    assert [device['id'] for device in devices.find('roomId', 2)] == [3, 1]
+    assert devices.update(99, {'name': 'x'}) is None
+
+
+def test_remove_drops_record_from_indexes():
+    devices = make_devices()
+    assert devices.remove(2)['name'] == 'Heater'
+    assert devices.remove(2) is None
+    assert devices.find('roomId', 1) == [devices.get(1)]
+    devices.remove(3)
+    assert devices.count('roomId', 2) == 0
+
+
+def test_store_collections():
+    store = Store()
+    assert set(store.collections()) == {'users', 'houses', 'rooms', 'devices'}
+    store.rooms.add({'id': 1, 'name': 'Kitchen', 'houseId': 1})
+    store.clear()
+    assert len(store.rooms) == 0
+
+
+def test_ids_are_not_reused_after_delete():
+    devices = Collection('devices', indexed_fields=('roomId',))
+    first = devices.create({'name': 'Lamp', 'type': 'light', 'roomId': 1})
+    second = devices.create({'name': 'Fan', 'type': 'fan', 'roomId': 1})
+    devices.remove(second['id'])
+    third = devices.create({'name': 'Heater', 'type': 'heater', 'roomId': 1})
+    assert [first['id'], second['id'], third['id']] == [1, 2, 3]
+
+
+def test_explicit_ids_are_observed():
+    houses = Collection('houses')
+    houses.add({'id': 10, 'name': 'Cabin', 'address': 'Lake Rd'})
+    assert houses.create({'name': 'Flat', 'address': 'High St'})['id'] == 11
+
+
+def test_concurrent_creates_get_unique_ids():
+    houses = Collection('houses')
+
+    def create_many():
+        for _ in range(500):
+            houses.create({'name': 'House', 'address': 'Main St'})
+
+    threads = [threading.Thread(target=create_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(houses) == 4000
+    assert sorted(house['id'] for house in houses) == list(range(1, 4001))
+
+
+def test_persisted_allocator_skips_ids_after_restart(tmp_path):
+    path = str(tmp_path / 'devices.id')
+    ids = IdAllocator(path=path, block_size=10)
+    assert [ids.allocate() for _ in range(3)] == [1, 2, 3]
+    # a new process only knows the reserved ceiling, never an id below it
+    restarted = IdAllocator(path=path, block_size=10)
+    assert restarted.allocate() > 3
+
+
+def test_query_pages_by_id():
+    devices = make_devices()
+    page, cursor = devices.query(limit=2)
+    assert [device['id'] for device in page] == [1, 2]
+    assert cursor == 2
+    page, cursor = devices.query(after=cursor, limit=2)
+    assert [device['id'] for device in page] == [3]
+    assert cursor is None
+
+
+def test_query_filters_use_indexes():
+    devices = Collection('devices', indexed_fields=('roomId', 'type'))
+    for i, (room_id, kind) in enumerate([(1, 'light'), (1, 'fan'), (2, 'light'), (1, 'light')], start=1):
+        devices.add({'id': i, 'name': f'Device {i}', 'type': kind, 'roomId': room_id})
+    page, _ = devices.query({'roomId': 1, 'type': 'light'})
+    assert [device['id'] for device in page] == [1, 4]
+    page, cursor = devices.query({'type': 'light'}, after=1, limit=1)
+    assert [device['id'] for device in page] == [3]
+    assert cursor == 3
+    assert devices.query({'roomId': 99}) == ([], None)
@@ -0,0 +1,45 @@
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+import pytest
+import requests
+from server import SimpleAPIHandler, ThreadPoolHTTPServer, store
+
+
+@pytest.fixture
+def pool_server():
+    server = ThreadPoolHTTPServer(('localhost', 0), SimpleAPIHandler, workers=4, backlog=8)
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield f'http://localhost:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+    thread.join()
+    store.clear()
+
+
+def test_slow_client_does_not_block_other_requests(pool_server):
+    port = int(pool_server.rsplit(':', 1)[1])
+    slow = socket.create_connection(('localhost', port))
+    try:
+        # announce a body but never finish sending it
+        slow.sendall(b'POST /houses HTTP/1.1\r\nHost: localhost\r\n'
+                     b'Content-Type: application/json\r\nContent-Length: 100\r\n\r\n{"name"')
+        response = requests.get(f'{pool_server}/houses', timeout=5)
+        assert response.status_code == 200
+    finally:
+        slow.close()
+
+
+def test_concurrent_creates_get_unique_ids(pool_server):
+    def create(i):
+        return requests.post(f'{pool_server}/houses', json={'name': f'House {i}', 'address': 'Main St'}, timeout=5)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(create, range(40)))
+
+    assert all(response.status_code == 201 for response in responses)
+    ids = [response.json()['id'] for response in responses]
+    assert len(set(ids)) == 40
+    assert len(requests.get(f'{pool_server}/houses', timeout=5).json()) == 40